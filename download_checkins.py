@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """Download all Foursquare/Swarm checkins via the history search API."""
 
+import argparse
+import gzip
+import http.client
+import io
 import json
 import os
+import shutil
 import time
 import sys
-from urllib.request import urlopen, Request
 from urllib.error import HTTPError, URLError
 from datetime import datetime
 
@@ -23,67 +27,148 @@ def load_dotenv(path=".env"):
 load_dotenv()
 OAUTH_TOKEN = os.environ.get("OAUTH_TOKEN", "")
 USER_ID = os.environ.get("USER_ID", "self")
-BASE_URL = "https://api.foursquare.com/v2/users/{user_id}/historysearch"
+API_HOST = "api.foursquare.com"
+BASE_PATH = "/v2/users/{user_id}/historysearch"
 LIMIT = 50  # max per request
 OUTPUT_DIR = "data"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "all_checkins.json")
 RATE_LIMIT_DELAY = 0.5  # seconds between requests
 
+# One keep-alive connection reused for every page, so the TCP+TLS handshake
+# happens once per download instead of once per request.
+_CONN = http.client.HTTPSConnection(API_HOST, timeout=30)
+_HEADERS = {"Accept-Encoding": "gzip"}
+
+# Everything but the offset is the same for every page, so the request path
+# is built once. The v2 API authenticates via the oauth_token parameter.
+_PAGE_PATH = (
+    f"{BASE_PATH.format(user_id=USER_ID)}"
+    f"?locale=en&explicit-lang=false&v=20260220"
+    f"&limit={LIMIT}&m=swarm&clusters=false&sort=newestfirst"
+    f"&oauth_token={OAUTH_TOKEN}"
+    f"&offset="
+)
+
+
+def _get(path):
+    """GET a path on the shared connection, reconnecting once if it was dropped."""
+    for attempt in range(2):
+        try:
+            _CONN.request("GET", path, headers=_HEADERS)
+            resp = _CONN.getresponse()
+            body = resp.read()
+            if resp.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return resp, body
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError) as e:
+            _CONN.close()
+            if attempt:
+                raise URLError(e)
+        except (OSError, EOFError, http.client.HTTPException) as e:
+            _CONN.close()
+            raise URLError(e)
+
 
 def fetch_page(offset):
-    """Fetch a single page of checkins."""
-    url = (
-        f"{BASE_URL.format(user_id=USER_ID)}"
-        f"?locale=en&explicit-lang=false&v=20260220"
-        f"&offset={offset}&limit={LIMIT}"
-        f"&m=swarm&clusters=false&sort=newestfirst"
-        f"&oauth_token={OAUTH_TOKEN}"
-    )
-    req = Request(url)
-    resp = urlopen(req, timeout=30)
-    data = json.loads(resp.read().decode("utf-8"))
-    return data
+    """Fetch a single page of checkins, returning the decoded body and headers."""
+    path = f"{_PAGE_PATH}{offset}"
+    resp, body = _get(path)
+    if resp.status != 200:
+        url = f"https://{API_HOST}{path}"
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+    data = json.loads(body)
+    return data, resp.headers
 
 
-def main():
-    if not OAUTH_TOKEN:
-        print("Error: OAUTH_TOKEN not set. Export it or add to .env")
-        sys.exit(1)
+def rate_limit_delay(headers):
+    """Seconds to leave between requests, based on the reported API quota.
+
+    Uses the X-RateLimit-Remaining/Reset headers: waits for the reset once
+    the quota is nearly spent, and otherwise spaces requests no further apart
+    than RATE_LIMIT_DELAY or the remaining quota allows.
+    """
+    try:
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset = float(headers["X-RateLimit-Reset"])
+    except (TypeError, ValueError):
+        return RATE_LIMIT_DELAY
+    window = max(0.0, reset - time.time())
+    if remaining <= 1:
+        return window
+    return min(RATE_LIMIT_DELAY, window / remaining)
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    all_checkins = []
+def retry_after(headers, default=60):
+    """Seconds to wait after a 429, from the Retry-After header if present."""
+    try:
+        return max(0, int(headers["Retry-After"]))
+    except (TypeError, ValueError):
+        return default
+
+
+def summarize(c):
+    """Build the lightweight summary entry for a checkin."""
+    ts = c.get("createdAt")
+    venue = c.get("venue") or {}
+    categories = venue.get("categories")
+    location = venue.get("location") or {}
+    return {
+        "id": c.get("id"),
+        "createdAt": ts,
+        "date": datetime.fromtimestamp(ts).isoformat() if ts else None,
+        "venue_name": venue.get("name"),
+        "venue_category": categories[0].get("name") if categories else None,
+        "city": location.get("city"),
+        "state": location.get("state"),
+        "country": location.get("cc"),
+        "shout": c.get("shout"),
+    }
+
+
+def download_pages():
+    """Yield each page of checkin items until the history is exhausted."""
     offset = 0
+    fetched = 0
     total_expected = None
-
-    print(f"Starting download of checkins for user {USER_ID}...")
-    print(f"Using limit={LIMIT} per request\n")
+    next_request_at = 0.0
 
     while True:
+        # The rate-limit window is measured from the start of the previous
+        # request, so time spent downloading and decoding a page counts
+        # toward the delay instead of being added on top of it.
+        wait = next_request_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        started = time.monotonic()
+        next_request_at = started + RATE_LIMIT_DELAY
         try:
-            data = fetch_page(offset)
+            data, headers = fetch_page(offset)
         except HTTPError as e:
             print(f"\nHTTP Error at offset {offset}: {e.code} {e.reason}")
             if e.code == 401:
                 print("OAuth token may be expired. Get a fresh token.")
             elif e.code == 429:
-                print("Rate limited. Waiting 60s...")
-                time.sleep(60)
+                wait = retry_after(e.headers)
+                print(f"Rate limited. Waiting {wait}s...")
+                time.sleep(wait)
                 continue
             else:
                 body = e.read().decode("utf-8", errors="replace")
                 print(f"Response: {body[:500]}")
-            break
+            return
         except URLError as e:
             print(f"\nNetwork error at offset {offset}: {e}")
             print("Retrying in 5s...")
             time.sleep(5)
             continue
 
+        next_request_at = started + rate_limit_delay(headers)
+
         meta = data.get("meta", {})
         if meta.get("code") != 200:
             print(f"\nAPI error: {meta}")
-            break
+            return
 
         response = data.get("response", {})
         checkins_data = response.get("checkins", {})
@@ -96,65 +181,99 @@ def main():
         items = checkins_data.get("items", [])
         if not items:
             print(f"\nNo more items at offset {offset}. Done!")
-            break
+            return
 
-        all_checkins.extend(items)
+        fetched += len(items)
         print(
             f"  Fetched offset {offset:>5} - {offset + len(items) - 1:>5}  "
             f"| Got {len(items):>3} items  "
-            f"| Total so far: {len(all_checkins)}"
+            f"| Total so far: {fetched}"
         )
+        yield items
 
         if len(items) < LIMIT:
             print(f"\nReceived partial page ({len(items)} < {LIMIT}). Done!")
-            break
+            return
 
         offset += LIMIT
-        time.sleep(RATE_LIMIT_DELAY)
 
-    print(f"\n{'='*60}")
-    print(f"Downloaded {len(all_checkins)} total checkins")
-
-    # Save all checkins
-    output = {
-        "downloaded_at": datetime.now().isoformat(),
-        "user_id": USER_ID,
-        "total_checkins": len(all_checkins),
-        "checkins": all_checkins,
-    }
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+def encode_checkin(c, pretty=False):
+    """Serialize one checkin for the output file.
+
+    Compact by default, which lets json use its C encoder; pretty output
+    indents the checkin to sit inside the top-level "checkins" array.
+    """
+    if pretty:
+        return json.dumps(c, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+    return json.dumps(c, ensure_ascii=False, separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download all Swarm checkins")
+    parser.add_argument(
+        "--pretty", action="store_true",
+        help="Indent each checkin in the output file (larger and slower to write)",
+    )
+    parser.add_argument(
+        "--gzip", action="store_true",
+        help=f"Also write a gzip-compressed copy to {OUTPUT_FILE}.gz",
+    )
+    args = parser.parse_args()
+
+    if not OAUTH_TOKEN:
+        print("Error: OAUTH_TOKEN not set. Export it or add to .env")
+        sys.exit(1)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    print(f"Starting download of checkins for user {USER_ID}...")
+    print(f"Using limit={LIMIT} per request\n")
+
+    # Checkins and their summaries are written as each page arrives instead
+    # of being collected in memory first. Both files keep their usual JSON
+    # layout, with one checkin per line, and are written to a .part file
+    # that only replaces the previous download once complete.
+    summary_file = os.path.join(OUTPUT_DIR, "checkins_summary.json")
+    output_part = OUTPUT_FILE + ".part"
+    summary_part = summary_file + ".part"
+    total = 0
+
+    with open(output_part, "w", encoding="utf-8") as out, \
+            open(summary_part, "w", encoding="utf-8") as summary_out:
+        out.write(
+            "{\n"
+            f'  "downloaded_at": {json.dumps(datetime.now().isoformat())},\n'
+            f'  "user_id": {json.dumps(USER_ID)},\n'
+            '  "checkins": ['
+        )
+        summary_out.write("[")
+
+        for items in download_pages():
+            for c in items:
+                sep = ",\n" if total else "\n"
+                out.write(sep + "    " + encode_checkin(c, args.pretty))
+                summary_out.write(sep + "  " + json.dumps(summarize(c), ensure_ascii=False))
+                total += 1
+
+        out.write(f'\n  ],\n  "total_checkins": {total}\n}}\n')
+        summary_out.write("\n]\n")
+
+    os.replace(output_part, OUTPUT_FILE)
+    os.replace(summary_part, summary_file)
+
+    print(f"\n{'='*60}")
+    print(f"Downloaded {total} total checkins")
 
     file_size_mb = os.path.getsize(OUTPUT_FILE) / (1024 * 1024)
     print(f"Saved to {OUTPUT_FILE} ({file_size_mb:.1f} MB)")
 
-    # Also save a lightweight summary
-    summary_file = os.path.join(OUTPUT_DIR, "checkins_summary.json")
-    summary = []
-    for c in all_checkins:
-        venue = c.get("venue", {})
-        entry = {
-            "id": c.get("id"),
-            "createdAt": c.get("createdAt"),
-            "date": datetime.fromtimestamp(c.get("createdAt", 0)).isoformat()
-            if c.get("createdAt")
-            else None,
-            "venue_name": venue.get("name"),
-            "venue_category": (
-                venue.get("categories", [{}])[0].get("name")
-                if venue.get("categories")
-                else None
-            ),
-            "city": venue.get("location", {}).get("city"),
-            "state": venue.get("location", {}).get("state"),
-            "country": venue.get("location", {}).get("cc"),
-            "shout": c.get("shout"),
-        }
-        summary.append(entry)
-
-    with open(summary_file, "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    if args.gzip:
+        gz_file = OUTPUT_FILE + ".gz"
+        with open(OUTPUT_FILE, "rb") as src, gzip.open(gz_file, "wb", compresslevel=3) as dst:
+            shutil.copyfileobj(src, dst)
+        gz_size_mb = os.path.getsize(gz_file) / (1024 * 1024)
+        print(f"Saved compressed copy to {gz_file} ({gz_size_mb:.1f} MB)")
     print(f"Saved summary to {summary_file}")
 
 
@@ -5,11 +5,31 @@ import argparse
 import csv
 import json
 import sys
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+FIELDS = [
+    "id", "date_utc", "date_local", "year", "month", "day_of_week",
+    "venue_name", "category", "category_short",
+    "address", "cross_street", "city", "state", "postal_code",
+    "country", "country_code", "neighborhood",
+    "lat", "lng", "shout", "type", "photo_url", "venue_url", "foursquare_url",
+]
+
+
+# Column positions used for filtering and sorting parsed rows
+_YEAR = FIELDS.index("year")
+_CITY = FIELDS.index("city")
+_CATEGORY = FIELDS.index("category")
+_DATE_LOCAL = FIELDS.index("date_local")
 
 
 def parse_checkin(c):
-    """Extract flat fields from a checkin object."""
+    """Extract flat fields from a checkin object as a row tuple in FIELDS order."""
     venue = c.get("venue", {})
     location = venue.get("location", {})
     categories = venue.get("categories", [])
@@ -18,7 +38,9 @@ def parse_checkin(c):
     ts = c.get("createdAt")
     tz_offset_min = c.get("timeZoneOffset", 0)
     if ts:
-        utc_dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+        # Naive datetimes + isoformat() avoid the tz machinery and the
+        # strftime parser for every row; both are plain UTC wall clocks here.
+        utc_dt = _EPOCH + timedelta(seconds=ts)
         local_dt = utc_dt + timedelta(minutes=tz_offset_min)
     else:
         utc_dt = local_dt = None
@@ -29,41 +51,32 @@ def parse_checkin(c):
         p = photos[0]
         photo_url = f"{p.get('prefix', '')}original{p.get('suffix', '')}"
 
-    return {
-        "id": c.get("id", ""),
-        "date_utc": utc_dt.strftime("%Y-%m-%d %H:%M:%S") if utc_dt else "",
-        "date_local": local_dt.strftime("%Y-%m-%d %H:%M:%S") if local_dt else "",
-        "year": local_dt.year if local_dt else "",
-        "month": local_dt.month if local_dt else "",
-        "day_of_week": local_dt.strftime("%A") if local_dt else "",
-        "venue_name": venue.get("name", ""),
-        "category": category.get("name", ""),
-        "category_short": category.get("shortName", ""),
-        "address": location.get("address", ""),
-        "cross_street": location.get("crossStreet", ""),
-        "city": location.get("city", ""),
-        "state": location.get("state", ""),
-        "postal_code": location.get("postalCode", ""),
-        "country": location.get("country", ""),
-        "country_code": location.get("cc", ""),
-        "neighborhood": location.get("neighborhood", ""),
-        "lat": location.get("lat", ""),
-        "lng": location.get("lng", ""),
-        "shout": c.get("shout", ""),
-        "type": c.get("type", ""),
-        "photo_url": photo_url,
-        "venue_url": venue.get("url", ""),
-        "foursquare_url": c.get("canonicalUrl", ""),
-    }
-
-
-FIELDS = [
-    "id", "date_utc", "date_local", "year", "month", "day_of_week",
-    "venue_name", "category", "category_short",
-    "address", "cross_street", "city", "state", "postal_code",
-    "country", "country_code", "neighborhood",
-    "lat", "lng", "shout", "type", "photo_url", "venue_url", "foursquare_url",
-]
+    return (
+        c.get("id", ""),
+        utc_dt.isoformat(" ", "seconds") if utc_dt else "",
+        local_dt.isoformat(" ", "seconds") if local_dt else "",
+        local_dt.year if local_dt else "",
+        local_dt.month if local_dt else "",
+        _DAY_NAMES[local_dt.weekday()] if local_dt else "",
+        venue.get("name", ""),
+        category.get("name", ""),
+        category.get("shortName", ""),
+        location.get("address", ""),
+        location.get("crossStreet", ""),
+        location.get("city", ""),
+        location.get("state", ""),
+        location.get("postalCode", ""),
+        location.get("country", ""),
+        location.get("cc", ""),
+        location.get("neighborhood", ""),
+        location.get("lat", ""),
+        location.get("lng", ""),
+        c.get("shout", ""),
+        c.get("type", ""),
+        photo_url,
+        venue.get("url", ""),
+        c.get("canonicalUrl", ""),
+    )
 
 
 def main():
@@ -87,28 +100,28 @@ def main():
     )
     args = parser.parse_args()
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(args.input, "rb") as f:
+        data = json.loads(f.read())
 
     checkins = data.get("checkins", data if isinstance(data, list) else [])
     rows = [parse_checkin(c) for c in checkins]
 
     # Apply filters
     if args.year:
-        rows = [r for r in rows if r["year"] == args.year]
+        rows = [r for r in rows if r[_YEAR] == args.year]
     if args.city:
         city_lower = args.city.lower()
-        rows = [r for r in rows if city_lower in str(r["city"]).lower()]
+        rows = [r for r in rows if city_lower in str(r[_CITY]).lower()]
     if args.category:
         cat_lower = args.category.lower()
-        rows = [r for r in rows if cat_lower in str(r["category"]).lower()]
+        rows = [r for r in rows if cat_lower in str(r[_CATEGORY]).lower()]
 
     # Sort by date (newest first)
-    rows.sort(key=lambda r: r["date_local"], reverse=True)
+    rows.sort(key=itemgetter(_DATE_LOCAL), reverse=True)
 
     with open(args.output, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDS)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
         writer.writerows(rows)
 
     print(f"Exported {len(rows)} checkins to {args.output}")
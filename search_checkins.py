@@ -3,9 +3,17 @@
 
 import argparse
 import json
+import os
+import pickle
 import sys
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
 from collections import Counter
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
 
 # ── ANSI colors ──────────────────────────────────────────────────────────────
 
@@ -24,83 +32,297 @@ RED = "\033[31m"
 
 DATA_FILE = "data/all_checkins.json"
 
+# Bump whenever the normalized record layout changes so stale caches are
+# rebuilt instead of loaded.
+CACHE_VERSION = 7
+
+# Distinct filter combinations memoized per loaded CheckinList
+FILTER_CACHE_SIZE = 128
+
+# Sort key stand-in for checkins without a timestamp
+_TS_MIN = float("-inf")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Checkin:
+    """A normalized checkin record.
+
+    Slots instead of a per-record dict keep thousands of loaded checkins
+    compact and make field access a plain attribute load.
+
+    The local time is kept as `ts`, epoch seconds shifted by the checkin's
+    time zone offset. The `dt` datetime is only built when a command first
+    asks for it, which for most commands is just the rows they print.
+    """
+
+    __slots__ = (
+        "_dt", "id", "ts", "year", "month", "weekday", "ym",
+        "venue", "category", "category_short", "category_code",
+        "address", "city", "state", "country", "neighborhood",
+        "shout", "type",
+        "venue_lc", "category_lc", "category_short_lc", "city_lc", "state_lc",
+        "neighborhood_lc", "shout_lc", "search_blob",
+    )
+
+    # The fields that are pickled: everything but the lazily built datetime
+    _FIELDS = tuple(name for name in __slots__ if name != "_dt")
+
+    def __init__(self, **fields):
+        self._dt = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @property
+    def dt(self):
+        """Local date and time as a datetime, or None if the checkin has none."""
+        dt = self._dt
+        if dt is None and self.ts is not None:
+            dt = self._dt = _EPOCH + timedelta(seconds=self.ts)
+        return dt
+
+    # Pickled as a plain tuple of field values: smaller than the default
+    # per-slot mapping and quicker to restore from the load cache. The
+    # lazily built datetime is left out and rebuilt on demand.
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self._FIELDS)
+
+    def __setstate__(self, state):
+        self._dt = None
+        for name, value in zip(self._FIELDS, state):
+            setattr(self, name, value)
+
+
+def _sort_key(c):
+    """Sort key placing checkins without a timestamp before all others."""
+    return c.ts if c.ts is not None else _TS_MIN
+
+
+class CheckinList(list):
+    """Loaded checkins, plus lookup indexes for the exact-match filters.
+
+    The checkins are sorted newest first once, here, and every index and
+    filter result keeps that order, so commands never need to re-sort.
+
+    Each index maps a year, month, (year, month) pair or lowercased state to
+    the checkins that have it, so filter_checkins can start from one bucket
+    instead of scanning every checkin. Dated checkins are also kept with
+    ascending bisect keys, so a date range is two binary searches.
+    The distinct lowercased venue, category and city values are kept so a
+    substring filter can be tested once per value rather than once per row,
+    and dining checkins are kept as their own bucket for the dining commands.
+    """
+
+    def __init__(self, checkins=()):
+        super().__init__(sorted(checkins, key=_sort_key, reverse=True))
+        self.by_year = {}
+        self.by_month = {}
+        self.by_year_month = {}
+        self.by_state = {}
+        for c in self:
+            if c.ts is not None:
+                self.by_year.setdefault(c.year, []).append(c)
+                self.by_month.setdefault(c.month, []).append(c)
+                self.by_year_month.setdefault((c.year, c.month), []).append(c)
+            self.by_state.setdefault(c.state_lc, []).append(c)
+        self.dining = [c for c in self if is_restaurant(c)]
+        self.distinct = {
+            attr: frozenset(getattr(c, attr) for c in self)
+            for attr in ("venue_lc", "category_lc", "category_short_lc", "city_lc")
+        }
+        self.filter_cache = {}
+        self.text_cache = {}
+        self.by_date = [c for c in self if c.ts is not None]
+        self.date_keys = [-c.ts for c in self.by_date]
+
+    def date_range(self, after=None, before=None):
+        """Return dated checkins with after <= dt <= before, newest first."""
+        lo = bisect_left(self.date_keys, -before.timestamp()) if before else 0
+        hi = bisect_right(self.date_keys, -after.timestamp()) if after else len(self.date_keys)
+        return self.by_date[lo:hi]
+
+
+def cache_path(path):
+    """Return the path of the parsed-checkins cache kept next to a JSON file."""
+    return os.path.splitext(path)[0] + ".pkl"
+
 
 def load_checkins(path=DATA_FILE):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    """Load normalized checkins, reusing the pickle cache while it is fresh.
+
+    Parsing the JSON dominates startup for short commands, so the parsed
+    records are cached next to the JSON file. The cache records the size and
+    modification time of the JSON it was built from and is only reused while
+    both still match.
+    """
+    st = os.stat(path)
+    source = (st.st_size, st.st_mtime_ns)
+    cache = cache_path(path)
+    try:
+        with open(cache, "rb") as f:
+            version, cached_source, checkins = pickle.load(f)
+        if version == CACHE_VERSION and cached_source == source:
+            return CheckinList(checkins)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError,
+            pickle.PickleError):
+        # Missing, stale or unreadable cache (including one pickled while this
+        # file ran under a different module name): rebuild it below.
+        pass
+
+    checkins = parse_checkins(path)
+    # Write to a uniquely named temporary file first so a concurrent run
+    # never reads, or writes into, a half-written cache.
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache) or ".", suffix=".tmp")
+    except OSError:
+        return CheckinList(checkins)  # caching is best-effort, e.g. on a read-only data directory
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((CACHE_VERSION, source, checkins), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except OSError:
+        pass
+    finally:
+        # Gone already once replaced; otherwise don't leave it behind
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return CheckinList(checkins)
+
+
+def parse_checkins(path):
+    """Parse a checkins JSON file into a list of normalized records."""
+    with open(path, "rb") as f:
+        data = json.loads(f.read())
     raw = data.get("checkins", data if isinstance(data, list) else [])
 
+    # Venue, category and place names repeat across thousands of checkins,
+    # but the JSON decoder creates a new string for every occurrence.
+    # Interning keeps one object per distinct value (and per lowercased
+    # copy), which shrinks the loaded set and lets Counter and dict lookups
+    # match on identity.
+    lowered = {}
+
+    def lower(s):
+        lc = lowered.get(s)
+        if lc is None:
+            lc = lowered[s] = sys.intern(s.lower())
+        return lc
+
+    blobs = {}
+
     checkins = []
-    for c in raw:
+    for i, c in enumerate(raw):
+        # Drop the decoded checkin from the document as soon as it has been
+        # normalized, so the raw tree shrinks while the records are built
+        # instead of both being held in full at the peak.
+        raw[i] = None
         venue = c.get("venue", {})
         location = venue.get("location", {})
         categories = venue.get("categories", [])
-        category = categories[0].get("name", "") if categories else ""
-        category_short = categories[0].get("shortName", "") if categories else ""
+        category = sys.intern(categories[0].get("name", "")) if categories else ""
+        category_short = sys.intern(categories[0].get("shortName", "")) if categories else ""
         category_code = categories[0].get("categoryCode", 0) if categories else 0
 
         ts = c.get("createdAt")
         tz_offset = c.get("timeZoneOffset", 0)
         if ts:
-            utc_dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-            local_dt = utc_dt + timedelta(minutes=tz_offset)
+            local_ts = ts + tz_offset * 60
+            tm = time.gmtime(local_ts)
+            year, month, weekday = tm.tm_year, tm.tm_mon, tm.tm_wday
+            ym = f"{year:04d}-{month:02d}"
         else:
-            local_dt = None
-
-        checkins.append({
-            "id": c.get("id", ""),
-            "dt": local_dt,
-            "venue": venue.get("name", ""),
-            "category": category,
-            "category_short": category_short,
-            "category_code": category_code,
-            "address": location.get("address", ""),
-            "city": location.get("city", ""),
-            "state": location.get("state", ""),
-            "country": location.get("cc", ""),
-            "neighborhood": location.get("neighborhood", ""),
-            "lat": location.get("lat"),
-            "lng": location.get("lng"),
-            "shout": c.get("shout", ""),
-            "type": c.get("type", ""),
-        })
+            local_ts = year = month = weekday = ym = None
+
+        name = sys.intern(venue.get("name", ""))
+        city = sys.intern(location.get("city", ""))
+        state = sys.intern(location.get("state", ""))
+        neighborhood = sys.intern(location.get("neighborhood", ""))
+        shout = c.get("shout", "")
+        shout_lc = shout.lower() if shout else ""
+
+        # Free-text search tests one string per checkin instead of five.
+        # The NUL separator keeps a query from matching across fields, and
+        # checkins with the same fields share one blob.
+        blob_key = (lower(name), lower(category), lower(city), shout_lc, lower(neighborhood))
+        search_blob = blobs.get(blob_key)
+        if search_blob is None:
+            search_blob = blobs[blob_key] = "\x00".join(blob_key)
+
+        checkins.append(Checkin(
+            id=c.get("id", ""),
+            ts=local_ts,
+            # Date parts used for grouping and filtering, so the commands
+            # compare ints instead of calling strftime per checkin.
+            year=year,
+            month=month,
+            weekday=weekday,
+            ym=ym,
+            venue=name,
+            category=category,
+            category_short=category_short,
+            category_code=category_code,
+            address=location.get("address", ""),
+            city=city,
+            state=state,
+            country=sys.intern(location.get("cc", "")),
+            neighborhood=neighborhood,
+            shout=shout,
+            type=sys.intern(c.get("type", "")),
+            # Lowercased copies for case-insensitive matching, computed once
+            # here rather than on every filter pass.
+            venue_lc=lower(name),
+            category_lc=lower(category),
+            category_short_lc=lower(category_short),
+            city_lc=lower(city),
+            state_lc=lower(state),
+            neighborhood_lc=lower(neighborhood),
+            shout_lc=shout_lc,
+            search_blob=search_blob,
+        ))
     return checkins
 
 
 # ── Formatting helpers ───────────────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
 def fmt_date(dt):
+    # Memoized: the same checkins are listed again and again in a session.
     if not dt:
         return "unknown date"
     return dt.strftime("%a %b %d, %Y  %I:%M %p")
 
 
-def fmt_checkin(c, show_category=True, index=None):
-    """Format a single checkin as a colored string."""
-    parts = []
-    if index is not None:
-        parts.append(f"{DIM}{index:>4}.{RESET}")
+# Fixed pieces of a formatted checkin line, concatenated once here
+_DATE_PRE = "  " + CYAN
+_VENUE_PRE = RESET + "  " + BOLD + WHITE
+_DETAILS_PRE = "  " + DIM + "|" + RESET + " "
+_DETAIL_SEP = " " + DIM + "|" + RESET + " "
+_SHOUT_PRE = "\n        " + YELLOW + '"'
+_SHOUT_POST = '"' + RESET
 
-    parts.append(f"  {CYAN}{fmt_date(c['dt'])}{RESET}")
-    parts.append(f"  {BOLD}{WHITE}{c['venue']}{RESET}")
 
+def fmt_checkin(c, show_category=True, index=None):
+    """Format a single checkin as a colored string."""
     details = []
-    if show_category and c["category"]:
-        details.append(f"{MAGENTA}{c['category']}{RESET}")
-    if c["city"]:
-        loc = c["city"]
-        if c["state"]:
-            loc += f", {c['state']}"
-        details.append(f"{GREEN}{loc}{RESET}")
-    if c["neighborhood"]:
-        details.append(f"{DIM}{c['neighborhood']}{RESET}")
-    if details:
-        parts.append(f"  {DIM}|{RESET} " + f" {DIM}|{RESET} ".join(details))
-
-    if c["shout"]:
-        parts.append(f"\n        {YELLOW}\"{c['shout']}\"{RESET}")
+    if show_category and c.category:
+        details.append(MAGENTA + c.category + RESET)
+    if c.city:
+        if c.state:
+            details.append(GREEN + c.city + ", " + c.state + RESET)
+        else:
+            details.append(GREEN + c.city + RESET)
+    if c.neighborhood:
+        details.append(DIM + c.neighborhood + RESET)
 
-    return "".join(parts)
+    return "".join((
+        f"{DIM}{index:>4}.{RESET}" if index is not None else "",
+        _DATE_PRE, fmt_date(c.dt),
+        _VENUE_PRE, c.venue, RESET,
+        _DETAILS_PRE + _DETAIL_SEP.join(details) if details else "",
+        _SHOUT_PRE + c.shout + _SHOUT_POST if c.shout else "",
+    ))
 
 
 def print_header(text):
@@ -114,45 +336,183 @@ def print_count(n, label="checkins"):
     print(f"  {DIM}{n} {label}{RESET}\n")
 
 
+def print_block(lines):
+    """Print lines followed by a blank line, as one write rather than a print each."""
+    lines = list(lines)
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 def print_bar_chart(counter, max_bars=25, top_n=20):
-    """Print a horizontal bar chart from a Counter."""
-    items = counter.most_common(top_n)
+    """Print a horizontal bar chart from a Counter (or any label -> count dict).
+
+    Only the top_n bars are needed, so they are picked with a heap rather than
+    by sorting every label.
+    """
+    items = nlargest(top_n, counter.items(), key=itemgetter(1))
     if not items:
         return
     max_count = items[0][1]
     max_label_len = max(len(str(k)) for k, _ in items)
 
+    lines = []
     for label, count in items:
         bar_len = int((count / max_count) * max_bars)
         bar = "█" * bar_len
-        print(f"  {str(label):>{max_label_len}}  {GREEN}{bar}{RESET} {BOLD}{count}{RESET}")
-    print()
+        lines.append(f"  {str(label):>{max_label_len}}  {GREEN}{bar}{RESET} {BOLD}{count}{RESET}")
+    print_block(lines)
+
+
+def print_venue_ranking(visits, top_n):
+    """Print the top_n venues from a venue -> [count, latest checkin] dict.
+
+    Results are newest first, so the first checkin seen for a venue while
+    tallying is its latest visit.
+    """
+    items = nlargest(top_n, visits.items(), key=lambda kv: kv[1][0])
+    max_count = items[0][1][0] if items else 0
+    max_label = max(len(v) for v, _ in items) if items else 0
+
+    lines = []
+    for rank, (venue, (count, latest)) in enumerate(items, 1):
+        cat = latest.category_short or latest.category
+        bar_len = int((count / max_count) * 20)
+        bar = "█" * bar_len
+        lines.append(
+            f"  {BOLD}{rank:>3}.{RESET} {WHITE}{venue:{max_label}}{RESET}  "
+            f"{GREEN}{bar}{RESET} {BOLD}{count:>3}{RESET}  "
+            f"{DIM}{cat}{RESET}  {DIM}{latest.city}{RESET}"
+        )
+    print_block(lines)
 
 
 # ── Search/filter functions ──────────────────────────────────────────────────
 
 def filter_checkins(checkins, year=None, month=None, venue=None, category=None,
-                    city=None, state=None, shout=None):
+                    city=None, state=None, shout=None, after=None, before=None,
+                    dining=False):
+    """Return the checkins matching every given filter as a new list.
+
+    Results over a loaded CheckinList are memoized per distinct set of
+    filters, so repeated REPL queries and commands that re-filter with the
+    same arguments skip the scan.
+    """
+    if not isinstance(checkins, CheckinList):
+        return list(_match_checkins(checkins, year, month, venue, category,
+                                    city, state, shout, after, before, dining))
+    key = tuple(f.lower() if isinstance(f, str) else f
+                for f in (year, month, venue, category, city, state, shout, after, before,
+                          dining))
+    cache = checkins.filter_cache
+    results = cache.get(key)
+    if results is None:
+        if len(cache) >= FILTER_CACHE_SIZE:
+            cache.clear()
+        results = cache[key] = _match_checkins(checkins, *key)
+    return list(results)
+
+
+def search_text(checkins, query):
+    """Return the checkins with `query` in any free-text field, as a new list.
+
+    Results over a loaded CheckinList are memoized per query. A query that
+    contains an earlier one, as when a REPL search is refined from "sush"
+    to "sushi", only scans the smallest such earlier result, since every
+    checkin matching the longer query also matches the shorter one.
+    """
+    q = query.lower()
+    if not isinstance(checkins, CheckinList):
+        return [c for c in checkins if q in c.search_blob]
+    cache = checkins.text_cache
+    results = cache.get(q)
+    if results is None:
+        pool = checkins
+        for prev, matches in cache.items():
+            if prev in q and len(matches) < len(pool):
+                pool = matches
+        if len(cache) >= FILTER_CACHE_SIZE:
+            cache.clear()
+        results = cache[q] = [c for c in pool if q in c.search_blob]
+    return list(results)
+
+
+def _matching_values(checkins, attr, query, results):
+    """Return the distinct `attr` values containing `query`, or None.
+
+    Only used when the loaded list has fewer distinct values than there are
+    rows left to filter; the caller then keeps rows by set membership.
+    """
+    if not isinstance(checkins, CheckinList):
+        return None
+    values = checkins.distinct[attr]
+    if len(values) >= len(results):
+        return None
+    return {v for v in values if query in v}
+
+
+def _match_checkins(checkins, year, month, venue, category, city, state, shout, after, before,
+                    dining):
     results = checkins
-    if year:
-        results = [c for c in results if c["dt"] and c["dt"].year == year]
-    if month:
-        results = [c for c in results if c["dt"] and c["dt"].month == month]
+    seed = None
+    if isinstance(checkins, CheckinList):
+        # Seed from the smallest matching index bucket; the predicates below
+        # then only scan that bucket, and the ones the bucket already
+        # guarantees are skipped.
+        buckets = []
+        if year and month:
+            buckets.append(("year_month", checkins.by_year_month.get((year, month), [])))
+        elif year:
+            buckets.append(("year", checkins.by_year.get(year, [])))
+        elif month:
+            buckets.append(("month", checkins.by_month.get(month, [])))
+        if state:
+            buckets.append(("state", checkins.by_state.get(state.lower(), [])))
+        if after or before:
+            buckets.append(("date", checkins.date_range(after, before)))
+        if dining:
+            buckets.append(("dining", checkins.dining))
+        if buckets:
+            seed, results = min(buckets, key=lambda b: len(b[1]))
+    if dining and seed != "dining":
+        results = [c for c in results if is_restaurant(c)]
+    if after and seed != "date":
+        after_ts = after.timestamp()
+        results = [c for c in results if c.ts is not None and c.ts >= after_ts]
+    if before and seed != "date":
+        before_ts = before.timestamp()
+        results = [c for c in results if c.ts is not None and c.ts <= before_ts]
+    if year and seed not in ("year", "year_month"):
+        results = [c for c in results if c.year == year]
+    if month and seed not in ("month", "year_month"):
+        results = [c for c in results if c.month == month]
     if venue:
         v = venue.lower()
-        results = [c for c in results if v in c["venue"].lower()]
+        names = _matching_values(checkins, "venue_lc", v, results)
+        if names is None:
+            results = [c for c in results if v in c.venue_lc]
+        else:
+            results = [c for c in results if c.venue_lc in names]
     if category:
         cat = category.lower()
-        results = [c for c in results if cat in c["category"].lower() or cat in c["category_short"].lower()]
+        names = _matching_values(checkins, "category_lc", cat, results)
+        shorts = _matching_values(checkins, "category_short_lc", cat, results)
+        if names is None or shorts is None:
+            results = [c for c in results if cat in c.category_lc or cat in c.category_short_lc]
+        else:
+            results = [c for c in results if c.category_lc in names or c.category_short_lc in shorts]
     if city:
         ci = city.lower()
-        results = [c for c in results if ci in c["city"].lower()]
-    if state:
+        names = _matching_values(checkins, "city_lc", ci, results)
+        if names is None:
+            results = [c for c in results if ci in c.city_lc]
+        else:
+            results = [c for c in results if c.city_lc in names]
+    if state and seed != "state":
         st = state.lower()
-        results = [c for c in results if st == c["state"].lower()]
+        results = [c for c in results if st == c.state_lc]
     if shout:
         sh = shout.lower()
-        results = [c for c in results if c["shout"] and sh in c["shout"].lower()]
+        results = [c for c in results if sh in c.shout_lc]
     return results
 
 
@@ -163,7 +523,6 @@ def cmd_search(checkins, args):
         checkins, year=args.year, month=args.month, venue=args.venue,
         category=args.category, city=args.city, state=args.state, shout=args.shout,
     )
-    results.sort(key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
 
     limit = args.limit or 25
     total = len(results)
@@ -189,9 +548,7 @@ def cmd_search(checkins, args):
     print_header(title)
     print_count(total)
 
-    for i, c in enumerate(shown, 1):
-        print(fmt_checkin(c, index=i))
-    print()
+    print_block(fmt_checkin(c, index=i) for i, c in enumerate(shown, 1))
 
     if total > limit:
         print(f"  {DIM}Showing {limit} of {total} results. Use --limit to see more.{RESET}\n")
@@ -212,34 +569,48 @@ def cmd_stats(checkins, args):
     print_header(title)
     print_count(len(results))
 
+    # Tally every chart in one pass over the results. Months and weekdays
+    # are small fixed ranges, so they are counted in plain list bins.
+    venue_counter = Counter()
+    category_counter = Counter()
+    city_counter = Counter()
+    month_bins = [0] * 13
+    day_bins = [0] * 7
+    for c in results:
+        if c.venue:
+            venue_counter[c.venue] += 1
+        if c.category:
+            category_counter[c.category] += 1
+        if c.city:
+            city_counter[c.city] += 1
+        if c.ts is not None:
+            month_bins[c.month] += 1
+            day_bins[c.weekday] += 1
+
     # Top venues
     print(f"  {BOLD}Top Venues{RESET}")
-    print_bar_chart(Counter(c["venue"] for c in results if c["venue"]))
+    print_bar_chart(venue_counter)
 
     # Top categories
     print(f"  {BOLD}Top Categories{RESET}")
-    print_bar_chart(Counter(c["category"] for c in results if c["category"]))
+    print_bar_chart(category_counter)
 
     # Top cities
     print(f"  {BOLD}Top Cities{RESET}")
-    print_bar_chart(Counter(c["city"] for c in results if c["city"]))
+    print_bar_chart(city_counter)
 
     # By month (if not filtering by month)
     if not args.month and results:
         print(f"  {BOLD}By Month{RESET}")
         month_names = ["", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
                        "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        month_counter = Counter(c["dt"].month for c in results if c["dt"])
-        ordered = {month_names[m]: month_counter.get(m, 0) for m in range(1, 13)}
-        print_bar_chart(Counter(ordered))
+        print_bar_chart(dict(zip(month_names[1:], month_bins[1:])))
 
     # By day of week
     if results:
         print(f"  {BOLD}By Day of Week{RESET}")
         days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        day_counter = Counter(c["dt"].strftime("%A") for c in results if c["dt"])
-        ordered = {d: day_counter.get(d, 0) for d in days}
-        print_bar_chart(Counter(ordered))
+        print_bar_chart(dict(zip(days, day_bins)))
 
 
 def cmd_venues(checkins, args):
@@ -250,29 +621,18 @@ def cmd_venues(checkins, args):
     print_header("Venue Rankings")
     print_count(len(results))
 
-    venue_counts = Counter(c["venue"] for c in results if c["venue"])
-    top_n = args.limit or 30
-
-    items = venue_counts.most_common(top_n)
-    max_count = items[0][1] if items else 0
-    max_label = max(len(v) for v, _ in items) if items else 0
-
-    for rank, (venue, count) in enumerate(items, 1):
-        # Find latest visit and category for this venue
-        venue_checkins = [c for c in results if c["venue"] == venue]
-        latest = max(venue_checkins, key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc))
-        cat = latest["category_short"] or latest["category"]
-        city = latest["city"]
-
-        bar_len = int((count / max_count) * 20)
-        bar = "█" * bar_len
-
-        print(
-            f"  {BOLD}{rank:>3}.{RESET} {WHITE}{venue:{max_label}}{RESET}  "
-            f"{GREEN}{bar}{RESET} {BOLD}{count:>3}{RESET}  "
-            f"{DIM}{cat}{RESET}  {DIM}{city}{RESET}"
-        )
-    print()
+    # Count visits and track the latest visit per venue in a single pass
+    visits = {}
+    for c in results:
+        venue = c.venue
+        if not venue:
+            continue
+        entry = visits.get(venue)
+        if entry is None:
+            visits[venue] = [1, c]
+        else:
+            entry[0] += 1
+    print_venue_ranking(visits, args.limit or 30)
 
 
 def cmd_timeline(checkins, args):
@@ -280,7 +640,6 @@ def cmd_timeline(checkins, args):
         checkins, year=args.year, venue=args.venue, category=args.category,
         city=args.city, state=args.state,
     )
-    results.sort(key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc))
 
     title = "Timeline"
     if args.year:
@@ -291,18 +650,18 @@ def cmd_timeline(checkins, args):
     # Group by year-month
     groups = {}
     for c in results:
-        if c["dt"]:
-            key = c["dt"].strftime("%Y-%m")
-            groups.setdefault(key, []).append(c)
+        if c.ts is not None:
+            groups.setdefault(c.ym, []).append(c)
 
+    lines = []
     for ym in sorted(groups):
         items = groups[ym]
-        dt = items[0]["dt"]
+        dt = items[0].dt
         label = dt.strftime("%B %Y")
         bar_len = min(len(items), 50)
         bar = "█" * bar_len
-        print(f"  {BOLD}{label:>18}{RESET}  {GREEN}{bar}{RESET} {len(items)}")
-    print()
+        lines.append(f"  {BOLD}{label:>18}{RESET}  {GREEN}{bar}{RESET} {len(items)}")
+    print_block(lines)
 
 
 def cmd_categories(checkins, args):
@@ -312,13 +671,16 @@ def cmd_categories(checkins, args):
     print_header("Category Breakdown")
     print_count(len(results))
 
-    cat_counts = Counter(c["category"] for c in results if c["category"])
+    cat_counts = Counter(c.category for c in results if c.category)
     print_bar_chart(cat_counts, top_n=30, max_bars=30)
 
 
+_NORM_TABLE = str.maketrans("", "", "-& ")
+
+
 def _normalize(s):
     """Normalize a string for matching: lowercase, spaces/hyphens/& stripped."""
-    return s.lower().replace("-", "").replace(" ", "").replace("&", "")
+    return s.lower().translate(_NORM_TABLE)
 
 
 def is_restaurant(c):
@@ -327,7 +689,7 @@ def is_restaurant(c):
     Uses Foursquare's category code hierarchy: 13000-13999 = "Dining and Drinking".
     This covers restaurants, bars, cafés, bakeries, breweries, etc.
     """
-    return 13000 <= c.get("category_code", 0) <= 13999
+    return 13000 <= c.category_code <= 13999
 
 
 # Dining sub-type classification based on Foursquare category codes
@@ -339,35 +701,53 @@ _BAKERY_DESSERT = {13001, 13002, 13040, 13043, 13044, 13046}  # Bagel, Bakery, D
 _BREWERY_WINERY = {13029, 13050, 13387}  # Brewery, Distillery, Winery
 
 
+# Category code -> dining sub-type, so classification is one dict lookup
+_CODE_TO_TYPE = {
+    code: name
+    for codes, name in (
+        (_COFFEE_CAFE, "Coffee & Cafe"),
+        (_FAST_FOOD, "Fast Food"),
+        (_BARS, "Bars & Lounges"),
+        (_BAKERY_DESSERT, "Bakery & Desserts"),
+        (_BREWERY_WINERY, "Brewery & Winery"),
+    )
+    for code in codes
+}
+
+
 def dining_type(c):
     """Classify a dining checkin into a sub-type."""
-    code = c.get("category_code", 0)
-    if code in _COFFEE_CAFE:
-        return "Coffee & Cafe"
-    if code in _FAST_FOOD:
-        return "Fast Food"
-    if code in _BARS:
-        return "Bars & Lounges"
-    if code in _BAKERY_DESSERT:
-        return "Bakery & Desserts"
-    if code in _BREWERY_WINERY:
-        return "Brewery & Winery"
-    if 13000 <= code <= 13999:
-        return "Restaurants"
-    return "Other"
+    code = c.category_code
+    t = _CODE_TO_TYPE.get(code)
+    if t:
+        return t
+    return "Restaurants" if 13000 <= code <= 13999 else "Other"
+
+
+_DINING_TYPES = set(_CODE_TO_TYPE.values()) | {"Restaurants", "Other"}
+
+
+def filter_dining_type(results, dtype):
+    """Keep the checkins whose dining sub-type matches dtype, e.g. "coffee".
+
+    There are only a handful of sub-types, so the match is worked out once
+    per type name and each checkin just needs a set lookup.
+    """
+    dtype_norm = _normalize(dtype)
+    wanted = {t for t in _DINING_TYPES if dtype_norm in _normalize(t)}
+    return [c for c in results if dining_type(c) in wanted]
 
 
 def cmd_restaurants(checkins, args):
     results = filter_checkins(
         checkins, year=args.year, month=args.month, city=args.city, state=args.state,
+        dining=True,
     )
-    results = [c for c in results if is_restaurant(c)]
 
     # Filter by dining type if specified
     dtype = getattr(args, "type", None)
     if dtype:
-        dtype_norm = _normalize(dtype)
-        results = [c for c in results if dtype_norm in _normalize(dining_type(c))]
+        results = filter_dining_type(results, dtype)
 
     title = "Dining"
     if dtype:
@@ -377,83 +757,76 @@ def cmd_restaurants(checkins, args):
     print_header(title)
     print_count(len(results), "checkins")
 
+    # Tally every breakdown, and the latest visit per venue, in one pass
+    type_counts = Counter()
+    cat_counts = Counter()
+    visits = {}
+    year_counter = Counter()
+    for c in results:
+        type_counts[dining_type(c)] += 1
+        cat_counts[c.category] += 1
+        entry = visits.get(c.venue)
+        if entry is None:
+            visits[c.venue] = [1, c]
+        else:
+            entry[0] += 1
+        if c.ts is not None:
+            year_counter[c.year] += 1
+
     # Dining type breakdown
     print(f"  {BOLD}By Type{RESET}")
-    type_counts = Counter(dining_type(c) for c in results)
     type_order = ["Restaurants", "Fast Food", "Coffee & Cafe",
                   "Bars & Lounges", "Bakery & Desserts", "Brewery & Winery"]
     ordered = {t: type_counts.get(t, 0) for t in type_order if type_counts.get(t, 0) > 0}
-    print_bar_chart(Counter(ordered), max_bars=30)
+    print_bar_chart(ordered, max_bars=30)
 
     # Category breakdown
     print(f"  {BOLD}By Cuisine / Category{RESET}")
-    cat_counts = Counter(c["category"] for c in results)
     print_bar_chart(cat_counts, top_n=30, max_bars=30)
 
     # Top restaurant venues
     print(f"  {BOLD}Top Venues{RESET}")
-    venue_counts = Counter(c["venue"] for c in results)
-    top_n = args.limit or 20
-    items = venue_counts.most_common(top_n)
-    if items:
-        max_count = items[0][1]
-        max_label = max(len(v) for v, _ in items)
-        for rank, (venue, count) in enumerate(items, 1):
-            venue_checkins = [c for c in results if c["venue"] == venue]
-            latest = max(venue_checkins, key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc))
-            cat = latest["category_short"] or latest["category"]
-            city = latest["city"]
-            bar_len = int((count / max_count) * 20)
-            bar = "█" * bar_len
-            print(
-                f"  {BOLD}{rank:>3}.{RESET} {WHITE}{venue:{max_label}}{RESET}  "
-                f"{GREEN}{bar}{RESET} {BOLD}{count:>3}{RESET}  "
-                f"{DIM}{cat}{RESET}  {DIM}{city}{RESET}"
-            )
-        print()
+    if visits:
+        print_venue_ranking(visits, args.limit or 20)
 
     # By year (if not filtering by year)
-    if not args.year and results:
+    if not args.year and year_counter:
         print(f"  {BOLD}Visits by Year{RESET}")
-        year_counter = Counter(c["dt"].year for c in results if c["dt"])
+        max_count = max(year_counter.values())
         for yr in sorted(year_counter):
             count = year_counter[yr]
-            bar_len = int((count / max(year_counter.values())) * 25)
+            bar_len = int((count / max_count) * 25)
             bar = "█" * bar_len
             print(f"  {BOLD}{yr}{RESET}  {GREEN}{bar}{RESET} {count}")
         print()
 
 
 def cmd_recent(checkins, args):
-    results = filter_checkins(
-        checkins, year=args.year, month=args.month, city=args.city, state=args.state,
-    )
-    results = [c for c in results if is_restaurant(c)]
-
-    # Filter by dining type if specified
-    dtype = getattr(args, "type", None)
-    if dtype:
-        dtype_norm = _normalize(dtype)
-        results = [c for c in results if dtype_norm in _normalize(dining_type(c))]
-
-    results.sort(key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-
     # Date range filter
+    after_dt = before_dt = None
     if args.after:
         try:
             after_dt = datetime.strptime(args.after, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            results = [c for c in results if c["dt"] and c["dt"] >= after_dt]
         except ValueError:
             print(f"  {RED}Invalid --after date. Use YYYY-MM-DD format.{RESET}")
             return
     if args.before:
         try:
             before_dt = datetime.strptime(args.before, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            results = [c for c in results if c["dt"] and c["dt"] <= before_dt]
         except ValueError:
             print(f"  {RED}Invalid --before date. Use YYYY-MM-DD format.{RESET}")
             return
 
+    results = filter_checkins(
+        checkins, year=args.year, month=args.month, city=args.city, state=args.state,
+        after=after_dt, before=before_dt, dining=True,
+    )
+
+    # Filter by dining type if specified
+    dtype = getattr(args, "type", None)
+    if dtype:
+        results = filter_dining_type(results, dtype)
+
     limit = args.limit or 20
     total = len(results)
     shown = results[:limit]
@@ -477,14 +850,48 @@ def cmd_recent(checkins, args):
     print_header(title)
     print_count(total, "restaurant checkins")
 
-    for i, c in enumerate(shown, 1):
-        print(fmt_checkin(c, index=i))
-    print()
+    print_block(fmt_checkin(c, index=i) for i, c in enumerate(shown, 1))
 
     if total > limit:
         print(f"  {DIM}Showing {limit} of {total} results. Use --limit to see more.{RESET}\n")
 
 
+# Interactive command -> (handler, default --limit)
+_COMMANDS = {
+    "stats": (cmd_stats, None),
+    "venues": (cmd_venues, 30),
+    "timeline": (cmd_timeline, None),
+    "categories": (cmd_categories, None),
+    "cats": (cmd_categories, None),
+    "restaurants": (cmd_restaurants, 20),
+    "rest": (cmd_restaurants, 20),
+    "dining": (cmd_restaurants, 20),
+    "recent": (cmd_recent, 20),
+}
+
+_DINING_TYPE_WORDS = frozenset((
+    "restaurants", "fastfood", "fast-food", "coffee",
+    "bars", "bakery", "desserts", "brewery", "winery",
+))
+
+
+def _parse_ns(tokens, limit=None):
+    """Build the namespace for an interactive command like "recent 2023 coffee".
+
+    An optional year may follow the command, and a dining type keyword may
+    appear anywhere after it. Commands ignore the fields they don't use.
+    """
+    year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
+    dtype = None
+    for t in tokens[1:]:
+        if t.lower() in _DINING_TYPE_WORDS:
+            dtype = t
+    return argparse.Namespace(
+        year=year, month=None, venue=None, category=None, city=None, state=None,
+        shout=None, limit=limit, after=None, before=None, type=dtype,
+    )
+
+
 def cmd_interactive(checkins):
     """Interactive REPL mode."""
     print_header("Swarm Checkin Explorer")
@@ -535,73 +942,9 @@ def cmd_interactive(checkins):
         tokens = raw.split()
         cmd = tokens[0].lower()
 
-        # Stats command
-        if cmd == "stats":
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            ns = argparse.Namespace(
-                year=year, month=None, venue=None, category=None,
-                city=None, state=None, shout=None, limit=None,
-            )
-            cmd_stats(checkins, ns)
-            continue
-
-        # Venues command
-        if cmd == "venues":
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            ns = argparse.Namespace(
-                year=year, month=None, venue=None, category=None,
-                city=None, state=None, limit=30,
-            )
-            cmd_venues(checkins, ns)
-            continue
-
-        # Timeline command
-        if cmd == "timeline":
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            ns = argparse.Namespace(
-                year=year, month=None, venue=None, category=None,
-                city=None, state=None,
-            )
-            cmd_timeline(checkins, ns)
-            continue
-
-        # Categories command
-        if cmd in ("categories", "cats"):
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            ns = argparse.Namespace(
-                year=year, month=None, city=None, state=None,
-            )
-            cmd_categories(checkins, ns)
-            continue
-
-        # Restaurants / dining command
-        if cmd in ("restaurants", "rest", "dining"):
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            # Check for type keyword
-            dtype = None
-            for j, t in enumerate(tokens[1:], 1):
-                if t.lower() in ("restaurants", "fastfood", "fast-food", "coffee",
-                                  "bars", "bakery", "desserts", "brewery", "winery"):
-                    dtype = t
-            ns = argparse.Namespace(
-                year=year, month=None, city=None, state=None, limit=20, type=dtype,
-            )
-            cmd_restaurants(checkins, ns)
-            continue
-
-        # Recent restaurants command
-        if cmd == "recent":
-            year = int(tokens[1]) if len(tokens) > 1 and tokens[1].isdigit() else None
-            dtype = None
-            for j, t in enumerate(tokens[1:], 1):
-                if t.lower() in ("restaurants", "fastfood", "fast-food", "coffee",
-                                  "bars", "bakery", "desserts", "brewery", "winery"):
-                    dtype = t
-            ns = argparse.Namespace(
-                year=year, month=None, city=None, state=None,
-                limit=20, after=None, before=None, type=dtype,
-            )
-            cmd_recent(checkins, ns)
+        if cmd in _COMMANDS:
+            handler, limit = _COMMANDS[cmd]
+            handler(checkins, _parse_ns(tokens, limit))
             continue
 
         # Filter-based search: year YYYY, month N, city X, state X, cat X
@@ -634,23 +977,13 @@ def cmd_interactive(checkins):
         # Free text: search across venue, category, city, shout
         if query and not any([year, month, category, city, state]):
             # Try broad search
-            q = query.lower()
-            results = [
-                c for c in checkins
-                if q in c["venue"].lower()
-                or q in c["category"].lower()
-                or q in c["city"].lower()
-                or (c["shout"] and q in c["shout"].lower())
-                or q in c["neighborhood"].lower()
-            ]
+            results = search_text(checkins, query)
         else:
             results = filter_checkins(
                 checkins, year=year, month=month, venue=query or None,
                 category=category, city=city, state=state,
             )
 
-        results.sort(key=lambda c: c["dt"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-
         if not results:
             print(f"\n  {DIM}No results found.{RESET}\n")
             continue
@@ -660,16 +993,14 @@ def cmd_interactive(checkins):
         print_header(f"Results for \"{raw}\"")
         print_count(len(results))
 
-        for i, c in enumerate(results[:show_n], 1):
-            print(fmt_checkin(c, index=i))
-        print()
+        print_block(fmt_checkin(c, index=i) for i, c in enumerate(results[:show_n], 1))
 
         if len(results) > show_n:
             print(f"  {DIM}Showing {show_n} of {len(results)}. Narrow your search to see more.{RESET}\n")
 
         # Quick stats for the results
         if len(results) > 5:
-            top_venues = Counter(c["venue"] for c in results).most_common(5)
+            top_venues = Counter(c.venue for c in results).most_common(5)
             venue_str = ", ".join(f"{v} ({n})" for v, n in top_venues)
             print(f"  {DIM}Top venues: {venue_str}{RESET}\n")
 